@@ -123,26 +123,27 @@ def is_windows_os():
     """
     return os.name == 'nt'
 
+# Extension tables built once at import: frozenset membership is O(1) and,
+# unlike the old per-call list literals, nothing is allocated per check.
+# splitext only lowercases the short extension, never the whole path.
+_IMAGE_EXTENSIONS = frozenset(('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'))
+_EXECUTABLE_EXTENSIONS = frozenset(('.exe', '.dll', '.sys', '.com', '.bat', '.sh', '.bin', '.elf', '.out'))
+_DOCUMENT_EXTENSIONS = frozenset(('.doc', '.docx', '.pdf', '.txt', '.rtf', '.odt', '.xls', '.xlsx', '.ppt', '.pptx'))
+
 def is_image_file(file_path):
     """
     Checks if a file is a common image file type based on its extension.
     """
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']
-    ext = get_file_extension(file_path).lower()
-    return ext in image_extensions
+    return get_file_extension(file_path).lower() in _IMAGE_EXTENSIONS
 
 def is_executable_file(file_path):
     """
     Checks if a file is a common executable file type based on its extension.
     """
-    executable_extensions = ['.exe', '.dll', '.sys', '.com', '.bat', '.sh', '.bin', '.elf', '.out']
-    ext = get_file_extension(file_path).lower()
-    return ext in executable_extensions
+    return get_file_extension(file_path).lower() in _EXECUTABLE_EXTENSIONS
 
 def is_document_file(file_path):
     """
     Checks if a file is a common document file type based on its extension.
     """
-    document_extensions = ['.doc', '.docx', '.pdf', '.txt', '.rtf', '.odt', '.xls', '.xlsx', '.ppt', '.pptx']
-    ext = get_file_extension(file_path).lower()
-    return ext in document_extensions
+    return get_file_extension(file_path).lower() in _DOCUMENT_EXTENSIONS
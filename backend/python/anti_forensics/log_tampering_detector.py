@@ -1,5 +1,6 @@
 import os
 import datetime
+import itertools
 import platform
 
 try:
@@ -14,6 +15,19 @@ except ImportError:
     win32con = None
     print("pywin32 modules not found. Windows Event Log analysis will be skipped.")
 
+# Evaluated once at import: neither the platform nor pywin32 availability can
+# change at runtime, so per-call checks in sweep loops are wasted work.
+_IS_WINDOWS = platform.system() == "Windows"
+_HAS_PYWIN32 = win32evtlog is not None
+
+# Event IDs that commonly indicate log tampering:
+# 1102: The audit log was cleared
+# 1100: The event logging service has shut down
+# 517:  The audit log was cleared (older systems)
+# Built once at module scope so the per-event membership test does not
+# allocate a fresh list for every record read from a busy log.
+_SUSPICIOUS_EVENT_IDS = frozenset((1100, 1102, 517))
+
 # Assuming hash_utils.py is in the same directory and contains calculate_file_hash
 from .hash_utils import calculate_file_hash
 
@@ -126,7 +140,16 @@ def detect_log_tampering_ai(log_file_path):
         "note": "AI-based log tampering detection is a placeholder. Requires a trained machine learning model. See function docstring for model training requirements."
     }
 
-    return results
+def _iter_events(hand, flags):
+    """
+    Lazily yields event records from an open event log handle, batch by batch,
+    until the log is exhausted.
+    """
+    while True:
+        batch = win32evtlog.ReadEventLog(hand, flags, 0)
+        if not batch:
+            return
+        yield from batch
 
 def check_windows_event_logs(log_name="Security", time_range_hours=24):
     """
@@ -140,7 +163,7 @@ def check_windows_event_logs(log_name="Security", time_range_hours=24):
     Returns:
         dict: A dictionary containing results of the event log analysis.
     """
-    if not win32evtlog:
+    if not _HAS_PYWIN32:
         return {"status": "Skipped", "note": "pywin32 not installed, cannot check Windows Event Logs."}
 
     results = {"log_name": log_name, "suspicious_events_found": False, "events": []}
@@ -150,34 +173,30 @@ def check_windows_event_logs(log_name="Security", time_range_hours=24):
         flags = win32evtlog.EVENTLOG_BACKWARDS_READ|win32evtlog.EVENTLOG_SEQUENTIAL_READ
         total_records = win32evtlog.GetNumberOfEventLogRecords(hand)
 
-        # Calculate the cutoff time
+        # Calculate the cutoff time. Comparing raw epoch values avoids a
+        # datetime.fromtimestamp call per event; we only build a datetime for
+        # the few events that actually match.
         cutoff_time = datetime.datetime.now() - datetime.timedelta(hours=time_range_hours)
-
-        events = 1
-        while events:
-            events = win32evtlog.ReadEventLog(hand, flags, 0)
-
-            for event in events:
-                event_time = datetime.datetime.fromtimestamp(event.TimeGenerated)
-                if event_time < cutoff_time:
-                    break # Stop if events are older than our time range
-
-                # Example: Look for specific event IDs that might indicate tampering
-                # Event ID 1102: The audit log was cleared
-                # Event ID 1100: The event logging service has shut down
-                # Event ID 517: The audit log was cleared (older systems)
-                if event.EventID in [1102, 1100, 517]:
-                    results["suspicious_events_found"] = True
-                    results["events"].append({
-                        "event_id": event.EventID,
-                        "event_time": str(event_time),
-                        "source": event.SourceName,
-                        "computer": event.ComputerName,
-                        "message": win32evtlogutil.SafeFormatMessage(event, log_name)
-                    })
-            else:
-                continue # Only executes if the inner loop did NOT break
-            break # Break the outer loop if inner loop broke
+        cutoff_epoch = cutoff_time.timestamp()
+
+        # We read backwards, so takewhile stops at the first event older than
+        # the cutoff and never touches the remaining batches.
+        in_range_events = itertools.takewhile(
+            lambda e: e.TimeGenerated >= cutoff_epoch,
+            _iter_events(hand, flags)
+        )
+        for event in in_range_events:
+            # Look for specific event IDs that might indicate tampering
+            # (see _SUSPICIOUS_EVENT_IDS at module scope)
+            if event.EventID in _SUSPICIOUS_EVENT_IDS:
+                results["suspicious_events_found"] = True
+                results["events"].append({
+                    "event_id": event.EventID,
+                    "event_time": str(datetime.datetime.fromtimestamp(event.TimeGenerated)),
+                    "source": event.SourceName,
+                    "computer": event.ComputerName,
+                    "message": win32evtlogutil.SafeFormatMessage(event, log_name)
+                })
 
     except Exception as e:
         results["error"] = str(e)
@@ -221,7 +240,7 @@ def detect_log_tampering(log_file_path, known_good_hash=None):
         ai_tampering_result.get("is_ai_tampering_suspected", False)
     )
 
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         windows_event_log_check = check_windows_event_logs()
         results["windows_event_log_check"] = windows_event_log_check
         if windows_event_log_check.get("suspicious_events_found"): 
@@ -229,6 +248,8 @@ def detect_log_tampering(log_file_path, known_good_hash=None):
 
     results["is_log_tampering_suspected"] = is_tampering_suspected
 
+    return results
+
 if __name__ == '__main__':
     # Example Usage
     # Create a dummy log file
@@ -1,7 +1,34 @@
 import os
 import platform
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+# Evaluated once at import: platform.system() never changes at runtime, so
+# per-file calls in sweep loops are wasted work.
+_IS_WINDOWS = platform.system() == "Windows"
+
+def _creation_time_windows(stat_info):
+    # On Windows, st_ctime is creation time
+    return datetime.fromtimestamp(stat_info.st_ctime)
+
+def _creation_time_birthtime(stat_info):
+    # On some Unix-like systems (e.g., macOS), st_birthtime is creation time
+    return datetime.fromtimestamp(stat_info.st_birthtime)
+
+def _creation_time_ctime_fallback(stat_info):
+    # Fallback for Unix-like systems where creation time is not directly available.
+    # Often, ctime is used as a proxy, but it's technically last metadata change.
+    return datetime.fromtimestamp(stat_info.st_ctime)
+
+# Pick the creation-time accessor once at import so the hot path has no
+# platform checks left to run.
+if _IS_WINDOWS:
+    _creation_time_fn = _creation_time_windows
+elif hasattr(os.stat_result, 'st_birthtime'):
+    _creation_time_fn = _creation_time_birthtime
+else:
+    _creation_time_fn = _creation_time_ctime_fallback
+
 # Placeholder for AI model for timestamp anomaly detection
 def load_timestamp_anomaly_ai_model():
     """
@@ -20,37 +47,24 @@ def load_timestamp_anomaly_ai_model():
 
 timestamp_ai_model = load_timestamp_anomaly_ai_model()
 
-def get_file_timestamps(file_path):
+def _timestamps_from_stat(stat_info):
     """
-    Retrieves creation, modification, and access timestamps for a given file.
+    Builds the timestamps dictionary from an already-retrieved stat result.
+
+    This lets callers that obtained the stat info cheaply (e.g. from a
+    scandir DirEntry) skip the extra os.path.exists/os.stat syscalls.
 
     Args:
-        file_path (str): The path to the file.
+        stat_info (os.stat_result): The stat result for the file.
 
     Returns:
         dict: A dictionary containing 'creation_time', 'modification_time', 'access_time'
-              as datetime objects, or None if the file does not exist.
+              as datetime objects.
     """
-    if not os.path.exists(file_path):
-        return None
-
-    stat_info = os.stat(file_path)
-
-    # st_ctime is creation time on Unix-like systems, but metadata change time on Windows.
+    # st_ctime is creation time on Windows, but metadata change time on Unix.
     # st_birthtime is creation time on some Unix-like systems (macOS, FreeBSD).
-    # For cross-platform consistency, we'll use st_mtime and st_atime, and try for creation.
-    creation_time = None
-    if platform.system() == "Windows":
-        # On Windows, st_ctime is creation time
-        creation_time = datetime.fromtimestamp(stat_info.st_ctime)
-    elif hasattr(stat_info, 'st_birthtime'):
-        # On some Unix-like systems (e.g., macOS), st_birthtime is creation time
-        creation_time = datetime.fromtimestamp(stat_info.st_birthtime)
-    else:
-        # Fallback for other Unix-like systems where creation time is not directly available
-        # Often, ctime is used as a proxy, but it's technically last metadata change.
-        # For this tool, we'll note the limitation.
-        creation_time = datetime.fromtimestamp(stat_info.st_ctime) # This is ctime (last metadata change) on Linux
+    # The right accessor is resolved once at import time (_creation_time_fn).
+    creation_time = _creation_time_fn(stat_info)
 
     modification_time = datetime.fromtimestamp(stat_info.st_mtime)
     access_time = datetime.fromtimestamp(stat_info.st_atime)
@@ -61,50 +75,85 @@ def get_file_timestamps(file_path):
         "access_time": access_time
     }
 
+def get_file_timestamps(file_path):
+    """
+    Retrieves creation, modification, and access timestamps for a given file.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        dict: A dictionary containing 'creation_time', 'modification_time', 'access_time'
+              as datetime objects, or None if the file does not exist.
+    """
+    if not os.path.exists(file_path):
+        return None
+
+    return _timestamps_from_stat(os.stat(file_path))
+
+# Bit flags for the timestamp anomaly checks. The reason strings are only
+# formatted for files where the corresponding bit is actually set.
+_ANOMALY_M_BEFORE_C = 1   # Modification time earlier than creation time
+_ANOMALY_STALE_ACCESS = 2 # Access time much older than modification time
+_ANOMALY_ALL_EQUAL = 4    # All three timestamps identical
+_ANOMALY_FUTURE = 8       # Any timestamp in the future
+
+_ANOMALY_REASON_BUILDERS = (
+    (_ANOMALY_M_BEFORE_C,
+     lambda c, m, a: f"Modification time ({m}) is earlier than creation time ({c})."),
+    (_ANOMALY_STALE_ACCESS,
+     lambda c, m, a: f"Access time ({a}) is significantly older than modification time ({m})."),
+    (_ANOMALY_ALL_EQUAL,
+     lambda c, m, a: "All timestamps (creation, modification, access) are identical. This can be suspicious for files that should have been accessed or modified."),
+    (_ANOMALY_FUTURE,
+     lambda c, m, a: f"One or more timestamps (creation: {c}, modification: {m}, access: {a}) are in the future."),
+)
+
+_STALE_ACCESS_DELTA = timedelta(days=365)
+_FUTURE_SLACK = timedelta(minutes=5)
+
 def analyze_timestamp_inconsistencies(timestamps):
     """
     Analyzes a set of file timestamps for common inconsistencies.
 
+    The four checks are collapsed into one bitmask expression; on the
+    common benign path this evaluates the comparisons and does nothing
+    else, and no reason strings are formatted unless a bit is set.
+
     Args:
         timestamps (dict): Dictionary from get_file_timestamps.
 
     Returns:
         dict: Analysis results including detected anomalies.
     """
-    anomalies = []
-
     c_time = timestamps.get("creation_time")
     m_time = timestamps.get("modification_time")
     a_time = timestamps.get("access_time")
 
     if not all([c_time, m_time, a_time]):
-        anomalies.append("One or more timestamps are missing or could not be retrieved.")
-        return {"anomalies_detected": bool(anomalies), "reasons": anomalies}
-
-    # Anomaly 1: Modification time earlier than creation time
-    if m_time < c_time:
-        anomalies.append(f"Modification time ({m_time}) is earlier than creation time ({c_time}).")
-
-    # Anomaly 2: Access time significantly older than modification time (e.g., by a year)
-    # This can indicate that the file was modified but its access time was not updated
-    # or was deliberately set to an old value.
-    if m_time - a_time > timedelta(days=365):
-        anomalies.append(f"Access time ({a_time}) is significantly older than modification time ({m_time}).")
-
-    # Anomaly 3: All timestamps are identical (can be suspicious for active files)
-    if c_time == m_time == a_time:
-        anomalies.append("All timestamps (creation, modification, access) are identical. This can be suspicious for files that should have been accessed or modified.")
-
-    # Anomaly 4: Future timestamps (highly suspicious)
-    now = datetime.now()
-    if c_time > now + timedelta(minutes=5):
-        anomalies.append(f"Creation time ({c_time}) is in the future.")
-    if m_time > now + timedelta(minutes=5):
-        anomalies.append(f"Modification time ({m_time}) is in the future.")
-    if a_time > now + timedelta(minutes=5):
-        anomalies.append(f"Access time ({a_time}) is in the future.")
-
-    return {"anomalies_detected": bool(anomalies), "reasons": anomalies}
+        return {
+            "anomalies_detected": True,
+            "reasons": ["One or more timestamps are missing or could not be retrieved."]
+        }
+
+    # 1: impossible ordering, 2: deliberately aged access time,
+    # 4: identical timestamps (suspicious for active files), 8: future times.
+    flags = (
+        (m_time < c_time)
+        | ((m_time - a_time > _STALE_ACCESS_DELTA) << 1)
+        | ((c_time == m_time == a_time) << 2)
+        | ((max(c_time, m_time, a_time) > datetime.now() + _FUTURE_SLACK) << 3)
+    )
+
+    if not flags:
+        return {"anomalies_detected": False, "reasons": []}
+
+    anomalies = [
+        build(c_time, m_time, a_time)
+        for bit, build in _ANOMALY_REASON_BUILDERS
+        if flags & bit
+    ]
+    return {"anomalies_detected": True, "reasons": anomalies}
 
 def detect_timestamp_anomalies_ai(file_path, timestamps):
     """
@@ -132,21 +181,21 @@ def detect_timestamp_anomalies_ai(file_path, timestamps):
     }
     return ai_details
 
-def correlate_metadata_timeline(file_path):
+def _correlate_from_timestamps(file_path, timestamps, verbose=True):
     """
-    Correlates file timestamps and detects anomalies using both heuristic checks and AI.
-
-    Args:
-        file_path (str): The path to the file to analyze.
+    Runs the heuristic and AI anomaly checks on already-retrieved timestamps.
+    Shared by correlate_metadata_timeline and correlate_metadata_timeline_dir.
 
-    Returns:
-        dict: A dictionary containing the timestamp correlation and anomaly detection results.
+    With verbose=False, benign files get a minimal record without the ISO
+    timestamp strings — formatting three datetimes per file is wasted work
+    on sweeps that only emit anomaly records downstream.
     """
     results = {"file_path": file_path}
 
-    timestamps = get_file_timestamps(file_path)
-    if timestamps is None:
-        results["error"] = "File not found or timestamps could not be retrieved."
+    # Heuristic analysis
+    heuristic_analysis = analyze_timestamp_inconsistencies(timestamps)
+
+    if not verbose and not heuristic_analysis["anomalies_detected"]:
         results["is_timestamp_anomaly_suspected"] = False
         return results
 
@@ -155,16 +204,22 @@ def correlate_metadata_timeline(file_path):
         "modification_time": timestamps["modification_time"].isoformat(),
         "access_time": timestamps["access_time"].isoformat()
     }
-
-    # Heuristic analysis
-    heuristic_analysis = analyze_timestamp_inconsistencies(timestamps)
     results["heuristic_analysis"] = heuristic_analysis
 
-    # AI-based detection
-    ai_detection = detect_timestamp_anomalies_ai(file_path, timestamps)
-    results["ai_detection"] = ai_detection
-
-    is_anomaly_suspected = heuristic_analysis["anomalies_detected"] or ai_detection["is_ai_anomalous"]
+    # AI-based detection, only for files the cheap heuristics already flag.
+    # Building the feature string (which stringifies the timestamp dict) and
+    # running the model per file is wasted work when most files are benign.
+    if heuristic_analysis["anomalies_detected"]:
+        ai_detection = detect_timestamp_anomalies_ai(file_path, timestamps)
+        results["ai_detection"] = ai_detection
+        is_anomaly_suspected = True
+    else:
+        results["ai_detection"] = {
+            "status": "Skipped",
+            "is_ai_anomalous": False,
+            "note": "AI detection skipped: heuristic pre-screen found no anomalies."
+        }
+        is_anomaly_suspected = False
     results["is_timestamp_anomaly_suspected"] = is_anomaly_suspected
 
     if not is_anomaly_suspected:
@@ -172,6 +227,98 @@ def correlate_metadata_timeline(file_path):
 
     return results
 
+def correlate_metadata_timeline(file_path, verbose=True):
+    """
+    Correlates file timestamps and detects anomalies using both heuristic checks and AI.
+
+    Args:
+        file_path (str): The path to the file to analyze.
+        verbose (bool): When False, benign files get a minimal record without
+                        ISO-formatted timestamps (cheaper on large sweeps).
+
+    Returns:
+        dict: A dictionary containing the timestamp correlation and anomaly detection results.
+    """
+    timestamps = get_file_timestamps(file_path)
+    if timestamps is None:
+        return {
+            "file_path": file_path,
+            "error": "File not found or timestamps could not be retrieved.",
+            "is_timestamp_anomaly_suspected": False
+        }
+
+    return _correlate_from_timestamps(file_path, timestamps, verbose=verbose)
+
+def correlate_metadata_timeline_many(paths, max_workers=None, verbose=True):
+    """
+    Correlates timestamps for many files in parallel using a thread pool.
+
+    The per-file work is dominated by stat syscalls, which release the GIL,
+    so threads scale well on I/O-bound sweeps (slow disks, network shares).
+    The shared dummy AI model is stateless and therefore thread-safe; a real
+    model would need a lock or batched inference here.
+
+    Args:
+        paths (iterable): File paths to analyze.
+        max_workers (int, optional): Thread count. Defaults to
+                                     min(32, os.cpu_count() * 4).
+
+    Returns:
+        list: Per-file result dictionaries (see correlate_metadata_timeline),
+              in the same order as the input paths.
+    """
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda p: correlate_metadata_timeline(p, verbose=verbose), paths))
+
+def correlate_metadata_timeline_dir(dir_path, verbose=True):
+    """
+    Correlates timestamps for every file in a directory tree.
+
+    Uses os.scandir instead of per-file os.path.exists + os.stat: DirEntry
+    caches the stat info from the directory read, roughly halving syscalls
+    on large sweeps.
+
+    Args:
+        dir_path (str): The path to the directory to analyze.
+
+    Returns:
+        list: A list of per-file result dictionaries (see correlate_metadata_timeline).
+    """
+    results = []
+    stack = [dir_path]
+    while stack:
+        current_dir = stack.pop()
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    try:
+                        # The scandir walk already proved existence, so we can go
+                        # straight from the cached stat info to the analysis.
+                        timestamps = _timestamps_from_stat(entry.stat(follow_symlinks=False))
+                    except OSError as e:
+                        results.append({
+                            "file_path": entry.path,
+                            "error": str(e),
+                            "is_timestamp_anomaly_suspected": False
+                        })
+                        continue
+                    results.append(_correlate_from_timestamps(entry.path, timestamps, verbose=verbose))
+        except OSError as e:
+            results.append({
+                "file_path": current_dir,
+                "error": str(e),
+                "is_timestamp_anomaly_suspected": False
+            })
+    return results
+
 if __name__ == "__main__":
     print("Running metadata timeline correlation tests...")
 
@@ -1,6 +1,83 @@
 import json
+import time
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class _FileSummary:
+    """
+    Slim per-file record held in detailed_findings. __slots__ drops the
+    per-instance dict, shrinking each row from roughly 300 bytes to under
+    100 — tens of MB saved on 100K-file scans — and makes field access a
+    fixed-offset load instead of a hash lookup.
+    """
+    __slots__ = ("file_path", "overall_suspicion_score", "anomalies_found")
+
+    def __init__(self, file_path, overall_suspicion_score, anomalies_found):
+        self.file_path = file_path
+        self.overall_suspicion_score = overall_suspicion_score
+        self.anomalies_found = anomalies_found
+
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        return {
+            "file_path": self.file_path,
+            "overall_suspicion_score": self.overall_suspicion_score,
+            "anomalies_found": self.anomalies_found
+        }
+
+def _json_default(obj):
+    if isinstance(obj, _FileSummary):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps_indented(obj):
+    """
+    JSON-encodes an object with indentation, using orjson when available.
+    orjson serializes several times faster than stdlib json, which matters
+    when reports cover thousands of files.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=_json_default).decode()
+    return json.dumps(obj, indent=4, default=_json_default)
+
+# Suspicion-flag key -> reasons key, one pair per detector schema. Ordered
+# so the first match wins, replacing the old ten-arm if/elif ladder in
+# add_analysis_result with a single scan over a static table.
+# For log tampering, reasons are nested in timestamp_anomalies_check /
+# hash_integrity_check and handled specially below.
+_KEY_TABLE = (
+    ("is_log_tampering_suspected", "suspicion_reasons"),
+    ("is_suspicious_rename", "suspicion_reasons"),
+    ("is_timestamp_anomaly_suspected", "reasons"),
+    ("is_steganography_suspected", "reasons"),
+    ("is_fake_metadata_suspected", "reasons"),
+    ("is_data_wiping_suspected", "reasons"),
+    ("is_encryption_suspected", "reasons"),
+    ("is_hidden_file_suspected", "reasons"),
+    ("ads_detected", "ads_streams"),
+    ("is_timestomping_suspected", "reasons"),
+)
+
+# Per-file metadata fields that are not detector results. A frozenset gives
+# O(1) membership and, unlike the old inline list literal, isn't rebuilt on
+# every loop iteration.
+_SKIP_KEYS = frozenset(("file_path", "overall_suspicion_score", "ai_confidence_score"))
+
+# Bound format method for ADS reason strings. Hoisting it means the hot
+# loop skips both the per-call f-string setup and the attribute lookup,
+# and map() drives the formatting at C speed.
+_ads_fmt = "Detected ADS: {}".format
+
+# detector_name -> (suspicion_key, reasons_key), filled in on first sight of
+# each detector. A detector's result schema never changes between files, so
+# after warm-up the dispatch is one dict lookup instead of probing the
+# result dict against every _KEY_TABLE entry per file.
+_SCHEMA_CACHE = {}
+
 class ReportGenerator:
     """
     Generates structured reports from anti-forensics detection results.
@@ -8,10 +85,15 @@ class ReportGenerator:
 
     def __init__(self, tool_name="Anti-Forensics Analyzer"):
         self.tool_name = tool_name
+        # One raw clock read: time.time_ns() skips the datetime object
+        # machinery entirely and gives an integer that doubles as a compact,
+        # collision-resistant report id. The ISO timestamp is derived from
+        # the same reading so the two fields always agree.
+        ns = time.time_ns()
         self.report_data = {
-            "report_id": str(datetime.now().timestamp()),
+            "report_id": str(ns),
             "tool_name": self.tool_name,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.fromtimestamp(ns / 1e9).isoformat(),
             "summary": {
                 "total_files_analyzed": 0,
                 "total_anomalies_detected": 0,
@@ -19,6 +101,10 @@ class ReportGenerator:
             },
             "detailed_findings": []
         }
+        # (file_path, detector_name) -> pre-serialized details JSON. Encoding
+        # each anomaly's details once here means the human-readable report
+        # doesn't re-encode subtrees the JSON report also serializes.
+        self._details_json_cache = {}
 
     def add_analysis_result(self, file_path, analysis_results):
         """
@@ -29,56 +115,42 @@ class ReportGenerator:
             analysis_results (dict): The comprehensive results from the analyzer,
                                      including raw detection results and confidence scores.
         """
-        self.report_data["summary"]["total_files_analyzed"] += 1
+        # Local aliases keep the hot loop on fast locals instead of repeated
+        # self.report_data[...] attribute/item lookups.
+        summary = self.report_data["summary"]
+        summary["total_files_analyzed"] += 1
 
-        file_summary = {
-            "file_path": file_path,
-            "overall_suspicion_score": analysis_results.get("overall_suspicion_score", 0),
-            "anomalies_found": []
-        }
+        anomalies_found = []
+        n_anomalies = 0
+        file_summary = _FileSummary(
+            file_path,
+            analysis_results.get("overall_suspicion_score", 0),
+            anomalies_found
+        )
 
         # Iterate through detection modules and extract anomalies
         for detector_name, detector_result in analysis_results.items():
-            if detector_name in ["file_path", "overall_suspicion_score", "ai_confidence_score"]:
+            if detector_name in _SKIP_KEYS:
                 continue # Skip metadata fields
 
-            is_suspicious_key = None
-            reasons_key = None
-
-            # Determine the keys for suspicion status and reasons based on detector type
-            if "is_log_tampering_suspected" in detector_result:
-                is_suspicious_key = "is_log_tampering_suspected"
-                reasons_key = "suspicion_reasons" # For log tampering, reasons are in timestamp_anomalies_check or hash_integrity_check
-            elif "is_suspicious_rename" in detector_result:
-                is_suspicious_key = "is_suspicious_rename"
-                reasons_key = "suspicion_reasons"
-            elif "is_timestamp_anomaly_suspected" in detector_result:
-                is_suspicious_key = "is_timestamp_anomaly_suspected"
-                reasons_key = "reasons" # For metadata timeline
-            elif "is_steganography_suspected" in detector_result:
-                is_suspicious_key = "is_steganography_suspected"
-                reasons_key = "reasons"
-            elif "is_fake_metadata_suspected" in detector_result:
-                is_suspicious_key = "is_fake_metadata_suspected"
-                reasons_key = "reasons"
-            elif "is_data_wiping_suspected" in detector_result:
-                is_suspicious_key = "is_data_wiping_suspected"
-                reasons_key = "reasons"
-            elif "is_encryption_suspected" in detector_result:
-                is_suspicious_key = "is_encryption_suspected"
-                reasons_key = "reasons"
-            elif "is_hidden_file_suspected" in detector_result:
-                is_suspicious_key = "is_hidden_file_suspected"
-                reasons_key = "reasons"
-            elif "ads_detected" in detector_result:
-                is_suspicious_key = "ads_detected"
-                reasons_key = "ads_streams"
-            elif "is_timestomping_suspected" in detector_result:
-                is_suspicious_key = "is_timestomping_suspected"
-                reasons_key = "reasons"
+            # Determine the keys for suspicion status and reasons based on
+            # which suspicion flag the detector result carries. The probe
+            # against _KEY_TABLE only runs the first time a detector name is
+            # seen; afterwards the memoized schema is reused.
+            schema = _SCHEMA_CACHE.get(detector_name)
+            if schema is None:
+                schema = next(
+                    ((s, r) for s, r in _KEY_TABLE if s in detector_result),
+                    (None, None)
+                )
+                if schema[0] is not None:
+                    # Don't cache misses: an error payload (e.g. {"error": ...})
+                    # for one file shouldn't blind us to later real results.
+                    _SCHEMA_CACHE[detector_name] = schema
+            is_suspicious_key, reasons_key = schema
 
             if is_suspicious_key and detector_result.get(is_suspicious_key):
-                self.report_data["summary"]["total_anomalies_detected"] += 1
+                n_anomalies += 1
                 anomaly_details = {
                     "detector": detector_name,
                     "suspicion_score": detector_result.get("suspicion_score", "N/A"),
@@ -96,17 +168,23 @@ class ReportGenerator:
                             log_reasons.append("AI model flagged log tampering.")
                         anomaly_details["reasons"] = log_reasons if log_reasons else ["Log tampering suspected."]
                     elif detector_name == "ads_detection":
-                        anomaly_details["reasons"] = [f"Detected ADS: {ads}" for ads in detector_result.get(reasons_key, [])]
+                        anomaly_details["reasons"] = list(map(_ads_fmt, detector_result.get(reasons_key, ())))
                     else:
                         anomaly_details["reasons"] = detector_result.get(reasons_key, [f"{detector_name} suspected."])
                 
-                file_summary["anomalies_found"].append(anomaly_details)
+                # Serialize the details subtree once, at the point it can no
+                # longer change, so report rendering can reuse the string.
+                self._details_json_cache[(file_path, detector_name)] = \
+                    _dumps_indented(detector_result)
 
-        if file_summary["anomalies_found"]:
-            self.report_data["summary"]["suspicious_files"].append({
+                anomalies_found.append(anomaly_details)
+
+        if n_anomalies:
+            summary["total_anomalies_detected"] += n_anomalies
+            summary["suspicious_files"].append({
                 "file_path": file_path,
-                "overall_suspicion_score": file_summary["overall_suspicion_score"],
-                "anomalies_count": len(file_summary["anomalies_found"])
+                "overall_suspicion_score": file_summary.overall_suspicion_score,
+                "anomalies_count": n_anomalies
             })
             self.report_data["detailed_findings"].append(file_summary)
 
@@ -117,7 +195,40 @@ class ReportGenerator:
         Returns:
             str: A JSON string of the report.
         """
-        return json.dumps(self.report_data, indent=4)
+        return _dumps_indented(self.report_data)
+
+    def dump_json(self, path):
+        """
+        Writes the JSON report straight to disk.
+
+        Unlike generate_json_report, this never holds the multi-MB
+        serialized string alongside the report tree: stdlib json streams
+        encoder chunks into the buffered file handle, and orjson writes
+        its output bytes in one shot.
+
+        Args:
+            path (str): Destination file path.
+        """
+        if orjson is not None:
+            with open(path, 'wb', buffering=65536) as f:
+                f.write(orjson.dumps(self.report_data, option=orjson.OPT_INDENT_2,
+                                     default=_json_default))
+        else:
+            with open(path, 'w', buffering=65536) as f:
+                json.dump(self.report_data, f, indent=4, default=_json_default)
+
+    def dump_text(self, path):
+        """
+        Writes the human-readable report straight to disk, one fragment at
+        a time through a 64KB buffered writer, without ever joining the
+        full report string in memory.
+
+        Args:
+            path (str): Destination file path.
+        """
+        with open(path, 'w', buffering=65536) as f:
+            for part in self._iter_text_parts():
+                f.write(part)
 
     def generate_human_readable_report(self):
         """
@@ -126,7 +237,18 @@ class ReportGenerator:
         Returns:
             str: A formatted string of the report.
         """
-        report_str = f"""====================================================
+        # Join the streamed fragments once at the end: repeated str += in
+        # nested loops degrades to quadratic time as the report grows to
+        # many MB on thousand-file scans.
+        return "".join(self._iter_text_parts())
+
+    def _iter_text_parts(self):
+        """
+        Yields the human-readable report as a stream of string fragments.
+        Shared by generate_human_readable_report (joins in memory) and
+        dump_text (writes each fragment straight to a buffered file).
+        """
+        yield f"""====================================================
 {self.tool_name} Report
 ====================================================
 Report ID: {self.report_data['report_id']}
@@ -139,34 +261,39 @@ Summary:
 Suspicious Files ({len(self.report_data['summary']['suspicious_files'])}):
 """
         if not self.report_data['summary']['suspicious_files']:
-            report_str += "  No suspicious files found.\n"
+            yield "  No suspicious files found.\n"
         else:
             for sf in self.report_data['summary']['suspicious_files']:
-                report_str += f"  - File: {sf['file_path']}\n    Overall Suspicion Score: {sf['overall_suspicion_score']:.2f}\n    Anomalies Count: {sf['anomalies_count']}\n"
+                yield f"  - File: {sf['file_path']}\n    Overall Suspicion Score: {sf['overall_suspicion_score']:.2f}\n    Anomalies Count: {sf['anomalies_count']}\n"
 
-        report_str += "\nDetailed Findings:\n"
+        yield "\nDetailed Findings:\n"
         if not self.report_data['detailed_findings']:
-            report_str += "  No detailed findings to display.\n"
+            yield "  No detailed findings to display.\n"
         else:
             for df in self.report_data['detailed_findings']:
-                report_str += f"\n----------------------------------------------------
-File: {df['file_path']}
-Overall Suspicion Score: {df['overall_suspicion_score']:.2f}
-----------------------------------------------------
-"
-                if not df['anomalies_found']:
-                    report_str += "  No anomalies detected for this file.\n"
+                yield (
+                    f"\n----------------------------------------------------\n"
+                    f"File: {df.file_path}\n"
+                    f"Overall Suspicion Score: {df.overall_suspicion_score:.2f}\n"
+                    f"----------------------------------------------------\n"
+                )
+                if not df.anomalies_found:
+                    yield "  No anomalies detected for this file.\n"
                 else:
-                    for anomaly in df['anomalies_found']:
-                        report_str += f"  Detector: {anomaly['detector']}\n"
-                        report_str += f"  Suspicion Score: {anomaly['suspicion_score']:.2f}\n"
+                    for anomaly in df.anomalies_found:
+                        yield f"  Detector: {anomaly['detector']}\n"
+                        yield f"  Suspicion Score: {anomaly['suspicion_score']:.2f}\n"
                         if anomaly.get('reasons'):
-                            report_str += "  Reasons:\n"
+                            yield "  Reasons:\n"
                             for reason in anomaly['reasons']:
-                                report_str += f"    - {reason}\n"
-                        report_str += f"  Details: {json.dumps(anomaly['details'], indent=4)}\n"
-        report_str += "\n====================================================\n"
-        return report_str
+                                yield f"    - {reason}\n"
+                        details_json = self._details_json_cache.get(
+                            (df.file_path, anomaly['detector'])
+                        )
+                        if details_json is None:
+                            details_json = _dumps_indented(anomaly['details'])
+                        yield f"  Details: {details_json}\n"
+        yield "\n====================================================\n"
 
 if __name__ == "__main__":
     print("Running ReportGenerator tests...")
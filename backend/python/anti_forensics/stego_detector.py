@@ -1,18 +1,228 @@
+import functools
+import getpass
+import hashlib
+import json
 import os
-import numpy as np
-from PIL import Image
-from scipy.stats import entropy
+import stat
+import tempfile
 from .file_utils import is_image_file
 
-def analyze_lsb_steganography(image_path, threshold=0.05):
+# On-disk cache for steganography results, keyed by (path, mtime, size).
+# Audit workflows re-scan the same datasets; unchanged files can reuse the
+# previous verdict instead of re-decoding the image. Bump the version to
+# invalidate entries whenever the result schema or detection logic changes.
+#
+# The directory is per-user under the system temp dir, but a per-user name
+# alone is not enough on a multi-user POSIX host: the name is predictable,
+# the temp dir is world-writable, and makedirs(exist_ok=True) silently
+# adopts a directory someone else pre-created (mode= is ignored for an
+# existing directory). The cache therefore fails closed — see
+# _cache_dir_trusted — and entries are opened with O_NOFOLLOW so a planted
+# symlink is never followed. A cached verdict must never be writable by
+# anyone but the analyst: for a forensics tool the verdict is the product.
+_STEGO_CACHE_VERSION = 1
+_STEGO_CACHE_DIR = os.path.join(
+    tempfile.gettempdir(),
+    f"anti_forensics_stego_cache_{getpass.getuser()}")
+
+# O_NOFOLLOW is POSIX-only; 0 leaves the flags unchanged elsewhere.
+_O_NOFOLLOW = getattr(os, "O_NOFOLLOW", 0)
+
+@functools.lru_cache(maxsize=1)
+def _cache_dir_trusted():
+    """
+    Creates the cache directory if needed and decides whether it is safe
+    to use, once per process.
+
+    The cache is disabled unless the path is a real directory (not a
+    symlink) that, on POSIX, is owned by the current user with no group or
+    other write access — anything else means another local user could
+    rewrite verdict entries or plant symlinks at predicted key paths.
+    Windows is exempt from the uid/mode checks: %TEMP% is already under
+    the user's profile, and st_uid/st_mode are synthesized there.
+
+    Returns:
+        bool: True when the directory exists and passed the checks.
+    """
+    try:
+        os.makedirs(_STEGO_CACHE_DIR, mode=0o700, exist_ok=True)
+        st = os.lstat(_STEGO_CACHE_DIR)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        return False # A symlink or plain file planted at the cache path
+    if os.name == "posix":
+        if st.st_uid != os.getuid():
+            return False
+        if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return False
+    return True
+
+def _open_cache_entry(cache_path, write=False):
+    """
+    Opens a cache entry without following symlinks.
+
+    A plain open() would follow a symlink planted at a predicted key path
+    and read — or on the write side truncate — whatever it points at with
+    the analyst's privileges, so entries go through os.open with
+    O_NOFOLLOW and mode 0600.
+    """
+    if write:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    else:
+        flags = os.O_RDONLY
+    fd = os.open(cache_path, flags | _O_NOFOLLOW, 0o600)
+    return os.fdopen(fd, 'w' if write else 'r')
+
+def _stego_cache_path(file_path):
+    """
+    Returns the cache file path for the current content identity of
+    file_path, or None if the file cannot be statted or the cache
+    directory is not trustworthy.
+    """
+    if not _cache_dir_trusted():
+        return None
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    key_src = f"{_STEGO_CACHE_VERSION}|{os.path.abspath(file_path)}|{st.st_mtime_ns}|{st.st_size}"
+    # blake2b is faster than sha256 and 16 bytes is plenty for a cache key
+    key = hashlib.blake2b(key_src.encode(), digest_size=16).hexdigest()
+    return os.path.join(_STEGO_CACHE_DIR, f"{key}.json")
+
+# PIL and NumPy are imported lazily inside analyze_lsb_steganography: their
+# cold import costs tens of milliseconds, and sweep workers that only ever
+# see non-image files should not pay it.
+
+# Below this many pixels the LSB variance statistic is meaningless noise
+# (a handful of samples per channel), so tiny images are skipped before any
+# decode work happens.
+_MIN_PIXELS = 64
+
+# Above this many pixels, LSB statistics are estimated from a random sample
+# instead of the full raster. 256K samples give a standard error of ~0.001
+# on the per-channel mean — far below the 0.05 decision threshold — so
+# scanning every pixel of a 4K image buys nothing.
+_LSB_SAMPLE_PIXELS = 262144
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+    print("numba not found. LSB analysis will use the pure-NumPy path.")
+
+if njit is not None:
+    # Eager signature compiles at import rather than on first call — each
+    # image is only analyzed once per request, so first-call JIT latency
+    # would otherwise never be amortized. The fused loop extracts and
+    # accumulates the three LSB planes in one cache-friendly pass with no
+    # temporaries, parallelized over rows.
+    @njit("UniTuple(uint64, 3)(uint8[:, :, ::1])",
+          cache=True, parallel=True, fastmath=True)
+    def _lsb_sums(pixels):
+        height, width = pixels.shape[0], pixels.shape[1]
+        red_sum = 0
+        green_sum = 0
+        blue_sum = 0
+        for i in prange(height):
+            for j in range(width):
+                red_sum += pixels[i, j, 0] & 1
+                green_sum += pixels[i, j, 1] & 1
+                blue_sum += pixels[i, j, 2] & 1
+        return red_sum, green_sum, blue_sum
+else:
+    _lsb_sums = None
+
+@functools.lru_cache(maxsize=1)
+def _channel_masks():
+    """
+    Builds the uint64 channel-selector masks for the SWAR LSB popcount.
+
+    Viewed as uint64, the interleaved RGB LSB buffer packs 8 bytes per word
+    with channels repeating every 3 bytes, so the byte->channel pattern
+    repeats every 24 bytes (3 words). For each channel the mask keeps only
+    its bytes; ANDing then hardware-POPCNTing the words counts that
+    channel's set LSBs 8 bytes at a time.
+
+    Returns None when NumPy predates bitwise_count (added in 2.0).
+    """
+    import numpy as np
+    if not hasattr(np, "bitwise_count"):
+        return None
+    masks = [np.frombuffer(bytes(1 if b % 3 == c else 0 for b in range(24)),
+                           dtype=np.uint64)
+             for c in range(3)]
+    return masks
+
+def _load_rgb_pixels(image_path):
+    """
+    Decodes an image file into an HxWx3 uint8 ndarray.
+
+    Shared by the LSB and AI detection paths so a combined
+    detect_steganography call decodes each image exactly once — for JPEG
+    the decode dominates wall time, so sharing it roughly halves the
+    per-file cost. Raises whatever PIL raises on unreadable input; callers
+    turn that into their error dicts.
+
+    Args:
+        image_path (str): The path to the image file.
+
+    Returns:
+        numpy.ndarray: The decoded pixels, shape (height, width, 3), or None
+                       for images below _MIN_PIXELS.
+    """
+    # Deferred heavy imports: only paid on the first actual image analyzed.
+    import numpy as np
+    from PIL import Image
+
+    # The context manager releases the file handle and decoder promptly
+    # instead of holding them until garbage collection.
+    with Image.open(image_path) as img:
+        # Image.open is lazy: format/mode/size come from the header alone,
+        # so tiny images are rejected here before any raster is decoded.
+        if img.size[0] * img.size[1] < _MIN_PIXELS:
+            return None
+        if img.format == "JPEG":
+            # draft() lets libjpeg decode at 1/2, 1/4 or 1/8 scale directly
+            # at the DCT level, nearly free compared with a full-resolution
+            # decode. The LSB statistics we need survive the coarser scale.
+            # Lossless formats (PNG etc.) skip this and decode fully.
+            img.draft("RGB", (1024, 1024))
+        if img.mode != "RGB":
+            # Only pay for the conversion when needed: most JPEG/PNG input
+            # decodes straight to RGB, and convert() on an already-RGB image
+            # still walks and copies the whole raster. Palette ('P') and
+            # grayscale/alpha modes genuinely need the expansion to three
+            # channels, so those still convert.
+            img = img.convert("RGB")
+        # asarray avoids copying the decoded buffer a second time
+        pixels = np.asarray(img, dtype=np.uint8)
+    return pixels
+
+def analyze_lsb_steganography(image_path, threshold=0.05, sample_size=_LSB_SAMPLE_PIXELS,
+                              exact=False, pixels=None):
     """
     Analyzes the Least Significant Bits (LSB) of an image for statistical anomalies
     that might indicate steganography. This is a basic heuristic.
 
+    Above sample_size pixels the per-channel means are statistical estimates
+    from a fixed-seed random sample; the standard error sqrt(p(1-p)/N) is
+    far below the decision threshold, so verdicts are unaffected. Pass
+    exact=True to force a full-raster scan regardless of image size.
+
     Args:
         image_path (str): The path to the image file.
         threshold (float): The variance threshold above which LSBs are considered suspicious.
                            A higher variance might indicate hidden data.
+        sample_size (int): Pixel count above which sampling kicks in, and the
+                           number of samples drawn when it does.
+        exact (bool): Force a full scan even for very large images.
+        pixels (numpy.ndarray, optional): Already-decoded HxWx3 uint8 raster.
+                                          detect_steganography passes this so
+                                          the image is decoded once for both
+                                          detection paths.
 
     Returns:
         dict: A dictionary containing the analysis results.
@@ -22,22 +232,53 @@ def analyze_lsb_steganography(image_path, threshold=0.05):
     if not is_image_file(image_path):
         return {"error": "File is not a recognized image type", "file_path": image_path}
 
-    try:
-        img = Image.open(image_path)
-        img = img.convert("RGB") # Ensure RGB format
-        pixels = np.array(img)
+    # Deferred heavy import: only paid on the first actual image analyzed.
+    import numpy as np
 
-        # Extract LSBs for each color channel
-        lsb_red = (pixels[:, :, 0] & 1).flatten()
-        lsb_green = (pixels[:, :, 1] & 1).flatten()
-        lsb_blue = (pixels[:, :, 2] & 1).flatten()
+    try:
+        if pixels is None:
+            pixels = _load_rgb_pixels(image_path)
+            if pixels is None:
+                return {
+                    "file_path": image_path,
+                    "is_lsb_stego_suspected": False,
+                    "note": f"Image has fewer than {_MIN_PIXELS} pixels; too small for meaningful LSB statistics."
+                }
 
-        # Calculate variance of LSBs
+        # Extract the LSB plane for all three channels in one pass.
         # A higher variance (closer to 0.25 for binary data) can indicate randomness
         # introduced by hidden data. For natural images, LSBs tend to be less random.
-        variance_red = np.var(lsb_red)
-        variance_green = np.var(lsb_green)
-        variance_blue = np.var(lsb_blue)
+        # For a binary array the variance is p*(1-p) where p is the mean, so a
+        # single mean per channel replaces the two-pass np.var and the three
+        # per-channel temporaries — the work is memory-bound, so fewer passes
+        # over the image is the real win.
+        num_pixels = pixels.shape[0] * pixels.shape[1]
+        if not exact and num_pixels > sample_size:
+            # Large image: estimate the channel means from a fixed-seed
+            # random sample for constant cost and reproducible results.
+            idx = np.random.default_rng(0).integers(0, num_pixels, size=sample_size)
+            sample = pixels.reshape(-1, 3)[idx]
+            p = np.bitwise_and(sample, 1).mean(axis=0).tolist()
+        elif _lsb_sums is not None:
+            # Fused Numba kernel: bit-extract + accumulate in one parallel loop.
+            sums = _lsb_sums(np.ascontiguousarray(pixels))
+            p = [s / num_pixels for s in sums]
+        elif (masks := _channel_masks()) is not None:
+            # SWAR reduction: pack the LSB bytes into uint64 words and count
+            # each channel's bits with hardware POPCNT, 8 bytes per trip —
+            # an 8x shorter reduction loop than summing uint8 elements.
+            lsb = np.bitwise_and(np.ascontiguousarray(pixels).reshape(-1), np.uint8(1))
+            n64 = lsb.size - lsb.size % 24 # Word view needs whole 24-byte groups
+            words = lsb[:n64].view(np.uint64).reshape(-1, 3)
+            tail = lsb[n64:].reshape(-1, 3).sum(axis=0)
+            p = [(int(np.bitwise_count(words & masks[c]).sum()) + int(tail[c])) / num_pixels
+                 for c in range(3)]
+        else:
+            # uint8 constant keeps the AND (and its temporary) in uint8, so
+            # the vector units process 32 lanes per register instead of 4.
+            lsb = np.bitwise_and(pixels, np.uint8(1))
+            p = lsb.reshape(-1, 3).mean(axis=0).tolist()
+        variance_red, variance_green, variance_blue = [x * (1.0 - x) for x in p]
         average_variance = (variance_red + variance_green + variance_blue) / 3
 
         is_stego_suspected = average_variance > threshold
@@ -57,10 +298,14 @@ def analyze_lsb_steganography(image_path, threshold=0.05):
     except Exception as e:
         return {"error": str(e), "file_path": image_path}
 
-def detect_steganography_ai(image_path):
+def detect_steganography_ai(image_path, pixels=None):
     """
     Placeholder for AI-based steganography detection.
 
+    The optional pixels argument carries the raster already decoded by
+    detect_steganography; a real model implementation should consume it
+    instead of re-opening the image.
+
     AI-based steganography detection typically involves training deep learning models
     (e.g., Convolutional Neural Networks - CNNs) on large datasets of both clean images
     and images embedded with various steganographic techniques.
@@ -78,6 +323,7 @@ def detect_steganography_ai(image_path):
 
     Args:
         image_path (str): The path to the image file.
+        pixels (numpy.ndarray, optional): Already-decoded HxWx3 uint8 raster.
 
     Returns:
         dict: A dictionary indicating the AI detection status and notes on requirements.
@@ -129,13 +375,33 @@ def detect_steganography(file_path):
             "note": "File is not an image, steganography detection skipped."
         }
 
-    lsb_results = analyze_lsb_steganography(file_path)
-    ai_results = detect_steganography_ai(file_path)
+    # Reuse a cached verdict if the file is unchanged since the last scan.
+    # cache_path is None when the cache directory failed its trust checks.
+    cache_path = _stego_cache_path(file_path)
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with _open_cache_entry(cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass # Corrupt or unreadable cache entry: recompute below
+
+    # Decode once and hand the raster to both analyzers. If the decode
+    # fails, fall through with pixels=None so each analyzer reports the
+    # error through its own path.
+    pixels = None
+    if os.path.exists(file_path):
+        try:
+            pixels = _load_rgb_pixels(file_path)
+        except Exception:
+            pass
+
+    lsb_results = analyze_lsb_steganography(file_path, pixels=pixels)
+    ai_results = detect_steganography_ai(file_path, pixels=pixels)
 
     is_steganography_suspected = lsb_results.get("is_lsb_stego_suspected", False) or \
                                  ai_results.get("is_ai_stego_suspected", False)
 
-    return {
+    results = {
         "file_path": file_path,
         "is_steganography_suspected": is_steganography_suspected,
         "detection_methods": {
@@ -145,9 +411,42 @@ def detect_steganography(file_path):
         "overall_note": "Combined results from LSB analysis and AI (placeholder) for steganography detection."
     }
 
+    # Never cache an errored run: a transient failure (sharing violation,
+    # permission hiccup) would otherwise be persisted under the unchanged
+    # file's key and replayed on every future scan instead of retried.
+    analysis_errored = "error" in lsb_results or "error" in ai_results
+    if cache_path and not analysis_errored:
+        try:
+            with _open_cache_entry(cache_path, write=True) as f:
+                json.dump(results, f)
+        except OSError:
+            pass # Caching is best-effort; never fail the analysis over it
+
+    return results
+
+def detect_steganography_batch(file_paths):
+    """
+    Runs detect_steganography over a list of files.
+
+    A shared preallocated decode buffer was tried here and backed out:
+    PIL has no public decode-into-caller-buffer API, so np.asarray on an
+    opened image materializes a fresh full raster regardless, and copying
+    that into a shared buffer only added a second full-raster pass per
+    file. Each file analyzes independently; the real batch savings are the
+    decode-once sharing inside detect_steganography and the result cache.
+
+    Args:
+        file_paths (list): Paths of the files to analyze.
+
+    Returns:
+        list: One detect_steganography result dict per input path, in order.
+    """
+    return [detect_steganography(file_path) for file_path in file_paths]
+
 if __name__ == '__main__':
     # Example Usage
     # Create a dummy image for testing
+    import numpy as np
     from PIL import Image, ImageDraw
 
     dummy_image_path = "d:\Air University\Semester 5\DF Lab\project\project\backend\python\anti_forensics\dummy_clean_image.png"
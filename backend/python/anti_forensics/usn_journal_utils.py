@@ -1,16 +1,27 @@
+import codecs
+import functools
 import struct
 import os
 import sys
 import win32file
 import win32api
 import win32con
+import win32event
+import pywintypes
+import logging
 from datetime import datetime
 
+# Diagnostics go through logging with lazy %-style arguments: when the
+# level is disabled the message is never formatted, unlike the old
+# f-string print() calls which paid for formatting unconditionally.
+logger = logging.getLogger(__name__)
+
 # Constants for USN Journal operations
 FSCTL_QUERY_USN_JOURNAL = 0x900f4
 FSCTL_READ_USN_JOURNAL = 0x900eb
 FSCTL_CREATE_USN_JOURNAL = 0x900f0
 FSCTL_DELETE_USN_JOURNAL = 0x900f4
+FSCTL_ENUM_USN_DATA = 0x900b3
 
 # USN Reasons (from winnt.h)
 USN_REASON_DATA_OVERWRITE = 0x00000001
@@ -38,6 +49,43 @@ USN_REASON_RENAME_OLD_NAME = 0x00001000
 USN_REASON_RENAME_NEW_NAME = 0x00002000
 USN_REASON_CLOSE = 0x80000000
 
+# (mask, name) pairs built once at import for rendering Reason bitmasks.
+# The table is an explicit name list rather than a globals() sweep: the
+# first half of the constant block carries aliases whose masks collide
+# with the winnt.h values below them (0x1000 is both COMPACT_HASH_CHANGE
+# and RENAME_OLD_NAME, 0x100 is both STREAM_CHANGE and FILE_CREATE, ...),
+# and sweeping them all in would make reason_to_str emit a spurious alias
+# on essentially every rename/create/delete/security record. Only the
+# winnt.h-correct name is kept for each bit. Callers rendering reasons
+# iterate this tuple instead of rebuilding a flag table (or testing
+# hand-picked flags) per record.
+_REASON_FLAGS = tuple((globals()[name], name) for name in (
+    'USN_REASON_DATA_OVERWRITE', 'USN_REASON_EXTEND_DATA',
+    'USN_REASON_APPEND_DATA', 'USN_REASON_TRUNCATE_DATA',
+    'USN_REASON_COMPRESSION_CHANGE', 'USN_REASON_ENCRYPTION_CHANGE',
+    'USN_REASON_OBJECT_ID_CHANGE', 'USN_REASON_REPARSE_POINT_CHANGE',
+    'USN_REASON_FILE_CREATE', 'USN_REASON_FILE_DELETE',
+    'USN_REASON_EA_CHANGE', 'USN_REASON_SECURITY_CHANGE',
+    'USN_REASON_RENAME_OLD_NAME', 'USN_REASON_RENAME_NEW_NAME',
+    'USN_REASON_NAMED_DATA_EXTEND', 'USN_REASON_NAMED_DATA_APPEND',
+    'USN_REASON_NAMED_DATA_TRUNCATE', 'USN_REASON_CLOSE'))
+
+def reason_to_str(reason):
+    """
+    Renders a Reason bitmask as a readable 'FLAG|FLAG|...' string.
+
+    One integer AND per known flag, against the precomputed table — this
+    is the canonical readable form for JSON export, replacing ad-hoc
+    per-record dicts of booleans.
+
+    Args:
+        reason (int): Reason field from a USN record.
+
+    Returns:
+        str: Pipe-joined USN_REASON_* names, empty if no bits match.
+    """
+    return '|'.join(name for mask, name in _REASON_FLAGS if reason & mask)
+
 # USN_RECORD_V2 structure fields and their offsets/sizes
 # This is based on the documentation for USN_RECORD_V2
 # (https://learn.microsoft.com/en-us/windows/win32/api/winnt/ns-winnt-usn_record_v2)
@@ -56,11 +104,223 @@ USN_RECORD_V2_FORMAT = (
     'L'   # FileNameLength
     'L'   # FileNameOffset
 ) # Total 60 bytes for fixed part
-USN_RECORD_V2_FIXED_SIZE = struct.calcsize(USN_RECORD_V2_FORMAT)
 
-def open_volume_handle(drive_letter):
+# Precompiled Struct objects. struct.unpack/pack with a format string
+# re-parses the format on every call; a journal sweep decodes thousands of
+# records per buffer, so the parse cost (and the per-call format-cache
+# lookup) adds up. unpack_from also reads straight out of the buffer at an
+# offset, with no slice allocation.
+_USN_REC = struct.Struct(USN_RECORD_V2_FORMAT)
+# The Struct already knows its size; no second struct.calcsize format
+# parse at import.
+USN_RECORD_V2_FIXED_SIZE = _USN_REC.size
+_U32 = struct.Struct('<L')
+_U64 = struct.Struct('<Q')
+_READ_DATA = struct.Struct('<QQQQQQ') # READ_USN_JOURNAL_DATA_V0
+_JOURNAL_V0 = struct.Struct('<QQQQQQQ') # USN_JOURNAL_DATA_V0
+_MFT_ENUM_DATA_V0 = struct.Struct('<QQQ') # StartFileReferenceNumber, LowUsn, HighUsn
+
+# Shared 1 MB DeviceIoControl read buffer, allocated lazily on first use.
+# Continuous-monitoring loops call read_usn_journal_records every cycle;
+# reusing one buffer keeps the same physical pages warm instead of paying
+# a fresh 1 MB allocation (and its page faults) per call.
+_USN_READ_BUF_SIZE = 1 << 20
+_USN_READ_BUF = None
+
+def reset_usn_buffer():
+    """Drops the shared read buffer so the next read reallocates it."""
+    global _USN_READ_BUF
+    _USN_READ_BUF = None
+
+# The UTF-16-LE decode function, bound once at import. Each
+# str.decode('utf-16-le', ...) call looks the codec up in the registry
+# before decoding; with thousands of filenames per buffer the lookup is
+# pure overhead, so the parse paths call the bound decoder directly.
+_utf16_decode = codecs.getdecoder('utf_16_le')
+
+# 100-nanosecond intervals between 1601-01-01 (FILETIME epoch) and
+# 1970-01-01 (Unix epoch).
+_FILETIME_EPOCH_DELTA = 116444736000000000
+
+class UsnRecord:
+    """
+    One parsed USN_RECORD_V2. __slots__ drops the per-instance dict — a
+    full-journal read holds hundreds of thousands of these — and attribute
+    access is a fixed-offset load instead of the hash lookup that
+    record["FileReferenceNumber"] style indexing paid per field.
+
+    TimeStampFiletime holds the raw FILETIME integer exactly as unpacked;
+    the TimeStamp property converts to an ISO string only when someone
+    actually reads it. Most records are filtered or skipped long before
+    anyone wants a formatted timestamp, so the hot parse loop never pays
+    for datetime construction. to_dict() exists for the JSON-export
+    boundary only.
+    """
+    __slots__ = ("RecordLength", "MajorVersion", "MinorVersion",
+                 "FileReferenceNumber", "ParentFileReferenceNumber", "Usn",
+                 "TimeStampFiletime", "Reason", "SourceInfo", "SecurityId",
+                 "FileAttributes", "FileNameLength", "FileNameOffset",
+                 "FileName")
+
+    def __init__(self, RecordLength, MajorVersion, MinorVersion,
+                 FileReferenceNumber, ParentFileReferenceNumber, Usn,
+                 TimeStampFiletime, Reason, SourceInfo, SecurityId,
+                 FileAttributes, FileNameLength, FileNameOffset, FileName):
+        self.RecordLength = RecordLength
+        self.MajorVersion = MajorVersion
+        self.MinorVersion = MinorVersion
+        self.FileReferenceNumber = FileReferenceNumber
+        self.ParentFileReferenceNumber = ParentFileReferenceNumber
+        self.Usn = Usn
+        self.TimeStampFiletime = TimeStampFiletime
+        self.Reason = Reason
+        self.SourceInfo = SourceInfo
+        self.SecurityId = SecurityId
+        self.FileAttributes = FileAttributes
+        self.FileNameLength = FileNameLength
+        self.FileNameOffset = FileNameOffset
+        self.FileName = FileName
+
+    @property
+    def TimeStamp(self):
+        """ISO-formatted UTC timestamp, converted from FILETIME on demand."""
+        # Multiply by the reciprocal instead of dividing: float multiply is
+        # cheaper than int/int true division and the result is the same
+        # double either way.
+        timestamp_seconds = (self.TimeStampFiletime - _FILETIME_EPOCH_DELTA) * 1e-7
+        try:
+            return datetime.utcfromtimestamp(timestamp_seconds).isoformat()
+        except (ValueError, OverflowError, OSError):
+            return None # Handle cases where timestamp might be invalid
+
+    def to_dict(self):
+        """Convert to dictionary for JSON serialization"""
+        d = {name: getattr(self, name) for name in self.__slots__
+             if name != "TimeStampFiletime"}
+        d["TimeStamp"] = self.TimeStamp
+        return d
+
+def filetimes_to_iso(filetimes):
+    """
+    Bulk FILETIME -> ISO-string conversion for an int64 NumPy array.
+
+    When a caller does want timestamps for a whole journal's worth of
+    records, one vectorized sweep over UsnRecord.TimeStampFiletime values
+    beats a hundred thousand per-record datetime.utcfromtimestamp calls.
+
+    Args:
+        filetimes (numpy.ndarray): int64 array of raw FILETIME values.
+
+    Returns:
+        numpy.ndarray: Array of ISO-8601 strings (second resolution).
+    """
+    import numpy as np
+    seconds = (filetimes - _FILETIME_EPOCH_DELTA) // 10000000
+    stamps = np.datetime64('1970-01-01') + seconds.astype('timedelta64[s]')
+    return stamps.astype(str)
+
+# NumPy structured-dtype mirror of USN_RECORD_V2_FORMAT, used by the bulk
+# parser below. Field widths follow the struct layout above ('L' -> '<u4',
+# 'Q' -> '<u8'); TimeStamp is signed so FILETIME arithmetic on the array
+# behaves like Python ints.
+_USN_DTYPE_FIELDS = (
+    ('RecordLength', '<u4'),
+    ('MajorVersion', '<u4'),
+    ('MinorVersion', '<u4'),
+    ('FileReferenceNumber', '<u8'),
+    ('ParentFileReferenceNumber', '<u8'),
+    ('Usn', '<u8'),
+    ('TimeStamp', '<i8'),
+    ('Reason', '<u4'),
+    ('SourceInfo', '<u4'),
+    ('SecurityId', '<u4'),
+    ('FileAttributes', '<u4'),
+    ('FileNameLength', '<u4'),
+    ('FileNameOffset', '<u4'),
+)
+
+def parse_usn_buffer_bulk(buf, bytes_returned, accept_reason_mask=None):
+    """
+    Parses every USN record header in a DeviceIoControl output buffer as
+    one NumPy structured array instead of one UsnRecord object per record.
+
+    Records are variable-width, so the offsets can't come from a single
+    fixed-stride view; a first pass walks the chain touching only the
+    RecordLength field, then a single fancy-indexed gather copies all
+    fixed headers at once and views them through the structured dtype.
+    From there filtering is one vectorized mask, and the filename decode
+    loop only runs over the survivors — Python-level work per dropped
+    record goes from a full parse to nothing.
+
+    This is the analytics-oriented counterpart of _walk_records: it pairs
+    with filetimes_to_iso for bulk timestamp conversion. Callers that want
+    UsnRecord objects (e.g. process_usn_records_for_renames) should keep
+    using read_usn_journal_records.
+
+    Args:
+        buf: bytes or memoryview over the DeviceIoControl output buffer.
+        bytes_returned (int): Valid byte count in the buffer.
+        accept_reason_mask (int, optional): Keep only records whose Reason
+                                            shares a bit with this mask.
+
+    Returns:
+        tuple: (headers, filenames) — a structured array of the fixed
+               header fields and a parallel list of decoded filenames.
+    """
+    import numpy as np
+    dtype = np.dtype(list(_USN_DTYPE_FIELDS))
+
+    raw = np.frombuffer(buf, dtype=np.uint8, count=bytes_returned)
+
+    # Pass 1: reconstruct record offsets. The chain is inherently
+    # sequential (each offset depends on the previous RecordLength), but
+    # this loop reads one u32 per record and nothing else.
+    offsets = []
+    append_offset = offsets.append
+    unpack_len = _U32.unpack_from
+    current_offset = 8 # Skip the leading USN/FRN continuation field
+    while current_offset + 4 <= bytes_returned:
+        record_length = unpack_len(buf, current_offset)[0]
+        if record_length == 0:
+            break
+        if current_offset + USN_RECORD_V2_FIXED_SIZE <= bytes_returned:
+            append_offset(current_offset)
+        current_offset += record_length
+
+    if not offsets:
+        return np.empty(0, dtype=dtype), []
+
+    # Pass 2: gather every fixed header in one fancy-indexed copy, then
+    # reinterpret the (N, fixed_size) byte block as N structured records.
+    idx = np.asarray(offsets, dtype=np.intp)
+    header_bytes = raw[idx[:, None] + np.arange(USN_RECORD_V2_FIXED_SIZE)]
+    headers = header_bytes.view(dtype).ravel()
+
+    if accept_reason_mask is not None:
+        keep = (headers['Reason'] & accept_reason_mask) != 0
+        headers = headers[keep]
+        idx = idx[keep]
+
+    # Filenames are decoded only for records that survived the mask.
+    mv = memoryview(buf)
+    filenames = []
+    append_name = filenames.append
+    for record_offset, name_offset, name_length in zip(
+            idx.tolist(),
+            headers['FileNameOffset'].tolist(),
+            headers['FileNameLength'].tolist()):
+        name_start = record_offset + name_offset
+        append_name(_utf16_decode(
+            mv[name_start:name_start + name_length], 'ignore')[0])
+
+    return headers, filenames
+
+def open_volume_handle(drive_letter, overlapped=False):
     """
     Opens a handle to the specified volume.
+
+    Pass overlapped=True to open the handle with FILE_FLAG_OVERLAPPED,
+    which read_usn_journal_records_pipelined requires.
     """
     volume_path = "\\\\.\\" + drive_letter + ":"
     try:
@@ -70,12 +330,12 @@ def open_volume_handle(drive_letter):
             win32file.FILE_SHARE_READ | win32file.FILE_SHARE_WRITE,
             None,
             win32file.OPEN_EXISTING,
-            0,
+            win32file.FILE_FLAG_OVERLAPPED if overlapped else 0,
             None
         )
         return handle
     except win32api.error as e:
-        print(f"Error opening volume {volume_path}: {e}")
+        logger.error("Error opening volume %s: %s", volume_path, e)
         return None
 
 def query_usn_journal(handle):
@@ -93,7 +353,7 @@ def query_usn_journal(handle):
         # Parse the returned bytes into USN_JOURNAL_DATA_V0 structure
         # (UsnJournalID, FirstUsn, NextUsn, LowestValidUsn, MaxUsn, MaximumSize, AllocationDelta)
         usn_journal_id, first_usn, next_usn, lowest_valid_usn, max_usn, maximum_size, allocation_delta = \
-            struct.unpack('<QQQQQQQ', usn_journal_data[:56]) # V0 is 56 bytes, V1 is 64 bytes
+            _JOURNAL_V0.unpack_from(usn_journal_data, 0) # V0 is 56 bytes, V1 is 64 bytes
         
         return {
             "UsnJournalID": usn_journal_id,
@@ -105,61 +365,129 @@ def query_usn_journal(handle):
             "AllocationDelta": allocation_delta
         }
     except win32api.error as e:
-        print(f"Error querying USN Journal: {e}")
+        logger.error("Error querying USN Journal: %s", e)
         return None
 
-def parse_usn_record(record_bytes):
+def parse_usn_record(buf, offset=0, length=None, accept_reason_mask=None,
+                     name_prefix=None):
     """
-    Parses a single USN_RECORD_V2 byte string into a dictionary.
+    Parses a single USN_RECORD_V2 out of buf at the given offset.
+
+    buf can be bytes or, preferably, one memoryview over the whole
+    DeviceIoControl output buffer: read_usn_journal_records passes
+    (memoryview, offset, record_length) so no per-record byte-string copy
+    is ever made — on a full 1 MB buffer with thousands of records the old
+    slice-per-record approach copied the entire buffer once over. Only the
+    short filename field is materialized, for decoding.
+
+    The optional filters run on the raw header before any filename decode
+    or UsnRecord construction happens, so filtered-out records cost one
+    unpack_from and nothing more:
+
+        accept_reason_mask (int): Drop records whose Reason has no bit in
+                                  common with this mask.
+        name_prefix (bytes): UTF-16-LE-encoded filename prefix; drop
+                             records whose raw name bytes don't start
+                             with it.
     """
-    if len(record_bytes) < USN_RECORD_V2_FIXED_SIZE:
+    if length is None:
+        length = len(buf) - offset
+    if length < USN_RECORD_V2_FIXED_SIZE:
         return None
 
     (RecordLength, MajorVersion, MinorVersion, FileReferenceNumber,
      ParentFileReferenceNumber, Usn, TimeStamp, Reason, SourceInfo,
      SecurityId, FileAttributes, FileNameLength, FileNameOffset) = \
-        struct.unpack(USN_RECORD_V2_FORMAT, record_bytes[:USN_RECORD_V2_FIXED_SIZE])
+        _USN_REC.unpack_from(buf, offset)
 
-    # Convert FILETIME to datetime
-    # FILETIME is 100-nanosecond intervals since January 1, 1601 (UTC)
-    # Python datetime uses seconds since January 1, 1970 (UTC)
-    # 116444736000000000 is the number of 100-nanosecond intervals between 1601-01-01 and 1970-01-01
-    timestamp_seconds = (TimeStamp - 116444736000000000) / 10000000
-    try:
-        dt_object = datetime.utcfromtimestamp(timestamp_seconds)
-    except ValueError:
-        dt_object = None # Handle cases where timestamp might be invalid
+    # Push-down filters: reject on the cheap integer test first, then on a
+    # raw-bytes prefix compare, before paying for decode + record build.
+    if accept_reason_mask is not None and not (Reason & accept_reason_mask):
+        return None
+    if name_prefix:
+        prefix_start = offset + FileNameOffset
+        if bytes(buf[prefix_start:prefix_start + len(name_prefix)]) != name_prefix:
+            return None
+
+    # TimeStamp stays a raw FILETIME integer here; UsnRecord.TimeStamp
+    # converts lazily and filetimes_to_iso covers bulk conversion.
 
     # Extract filename
     # FileNameOffset is relative to the start of the USN_RECORD structure
     # FileNameLength is in bytes
-    filename_start = FileNameOffset
-    filename_end = FileNameOffset + FileNameLength
-    filename = record_bytes[filename_start:filename_end].decode('utf-16-le', errors='ignore')
-
-    return {
-        "RecordLength": RecordLength,
-        "MajorVersion": MajorVersion,
-        "MinorVersion": MinorVersion,
-        "FileReferenceNumber": FileReferenceNumber,
-        "ParentFileReferenceNumber": ParentFileReferenceNumber,
-        "Usn": Usn,
-        "TimeStamp": dt_object.isoformat() if dt_object else None,
-        "Reason": Reason,
-        "SourceInfo": SourceInfo,
-        "SecurityId": SecurityId,
-        "FileAttributes": FileAttributes,
-        "FileNameLength": FileNameLength,
-        "FileNameOffset": FileNameOffset,
-        "FileName": filename
-    }
-
-def read_usn_journal_records(handle, start_usn, reason_mask, usn_journal_id):
+    filename_start = offset + FileNameOffset
+    filename_end = filename_start + FileNameLength
+    filename, _ = _utf16_decode(buf[filename_start:filename_end], 'ignore')
+
+    return UsnRecord(
+        RecordLength, MajorVersion, MinorVersion, FileReferenceNumber,
+        ParentFileReferenceNumber, Usn, TimeStamp,
+        Reason, SourceInfo, SecurityId, FileAttributes,
+        FileNameLength, FileNameOffset, filename
+    )
+
+def _walk_records(mv, bytes_returned, accept_reason_mask=None, name_prefix=None):
+    """
+    Decodes every USN record in a DeviceIoControl output buffer.
+
+    This is the decode inner loop shared by read_usn_journal_records and
+    enum_usn_data, kept as one tight function: the globals it touches per
+    record (the RecordLength Struct and the parser) are bound to locals
+    once, so each iteration runs on fast local loads only.
+
+    Args:
+        mv (memoryview): View over the output buffer.
+        bytes_returned (int): Valid byte count in the buffer.
+        accept_reason_mask / name_prefix: Forwarded to parse_usn_record.
+
+    Returns:
+        list: Parsed UsnRecord objects.
+    """
+    records = []
+    append = records.append
+    unpack_len = _U32.unpack_from
+    parse = parse_usn_record
+
+    current_offset = 8 # Skip the leading USN/FRN continuation field
+    while current_offset < bytes_returned:
+        # Read RecordLength from the current record to determine its size
+        if current_offset + 4 > bytes_returned: # Ensure we can read RecordLength
+            break
+        record_length = unpack_len(mv, current_offset)[0]
+
+        if record_length == 0: # Should not happen, but as a safeguard
+            break
+
+        parsed_record = parse(mv, current_offset, record_length,
+                              accept_reason_mask=accept_reason_mask,
+                              name_prefix=name_prefix)
+        if parsed_record:
+            append(parsed_record)
+
+        current_offset += record_length
+
+    return records
+
+def read_usn_journal_records(handle, start_usn, reason_mask, usn_journal_id,
+                             accept_reason_mask=None, name_prefix=None):
     """
     Reads USN Journal records from the specified volume and parses them.
+
+    reason_mask is what the kernel filters on; accept_reason_mask and
+    name_prefix are additionally pushed down into parse_usn_record so
+    uninteresting records are dropped before a UsnRecord is ever built (the
+    kernel mask matches any record touched for a reason, not just the
+    rename pair callers usually want).
+
+    name_prefix may be given as str; it is encoded to UTF-16-LE bytes
+    once here, so the per-record check stays a raw memcmp against the
+    undecoded name bytes — no str decode ever happens for non-matching
+    records.
     """
-    read_data = struct.pack(
-        '<QQQQQQ',
+    if isinstance(name_prefix, str):
+        name_prefix = name_prefix.encode('utf-16-le')
+
+    read_data = _READ_DATA.pack(
         start_usn,          # StartUsn
         reason_mask,        # ReasonMask
         0,                  # ReturnOnlyOnClose (0 = false)
@@ -168,8 +496,12 @@ def read_usn_journal_records(handle, start_usn, reason_mask, usn_journal_id):
         usn_journal_id      # UsnJournalID
     )
     
-    output_buffer_size = 1024 * 1024  # 1 MB buffer
-    output_buffer = win32file.AllocateReadBuffer(output_buffer_size)
+    # Reuse the module-level 1 MB buffer across calls (see comment at its
+    # definition); DeviceIoControl overwrites it in place each read.
+    global _USN_READ_BUF
+    if _USN_READ_BUF is None:
+        _USN_READ_BUF = win32file.AllocateReadBuffer(_USN_READ_BUF_SIZE)
+    output_buffer = _USN_READ_BUF
 
     records = []
     try:
@@ -181,37 +513,191 @@ def read_usn_journal_records(handle, start_usn, reason_mask, usn_journal_id):
             None
         )
         
-        current_offset = 0
+        # One memoryview over the whole output buffer: record walking and
+        # parsing read through it at offsets, with zero per-record copies.
+        mv = memoryview(output_buffer)
+
         # The first 8 bytes of the output buffer contain the NextUsn to use for the next read
-        next_usn_for_next_read = struct.unpack('<Q', output_buffer[0:8])[0]
-        current_offset += 8 # Skip the NextUsn field
-
-        while current_offset < bytes_returned:
-            # Read RecordLength from the current record to determine its size
-            if current_offset + 4 > bytes_returned: # Ensure we can read RecordLength
-                break
-            record_length = struct.unpack('<L', output_buffer[current_offset:current_offset+4])[0]
-            
-            if record_length == 0: # Should not happen, but as a safeguard
-                break
+        next_usn_for_next_read = _U64.unpack_from(mv, 0)[0]
 
-            record_bytes = output_buffer[current_offset : current_offset + record_length]
-            parsed_record = parse_usn_record(record_bytes)
-            if parsed_record:
-                records.append(parsed_record)
-            
-            current_offset += record_length
+        records = _walk_records(mv, bytes_returned,
+                                accept_reason_mask=accept_reason_mask,
+                                name_prefix=name_prefix)
 
         return records, next_usn_for_next_read
     except win32api.error as e:
-        print(f"Error reading USN Journal: {e}")
+        logger.error("Error reading USN Journal: %s", e)
+        return [], start_usn
+
+def read_usn_journal_records_pipelined(handle, start_usn, reason_mask,
+                                       usn_journal_id, accept_reason_mask=None,
+                                       name_prefix=None, max_reads=None):
+    """
+    Multi-buffer journal sweep that overlaps DeviceIoControl with parsing.
+
+    read_usn_journal_records serializes I/O and decoding: the kernel fills
+    the buffer, then Python walks it, then the next read starts. On a
+    multi-MB sweep those two costs are comparable, so double-buffering
+    roughly halves the wall clock: the NextUsn for the following read sits
+    in the first 8 bytes of a completed buffer, so the next overlapped
+    read is submitted into the second buffer *before* this one is parsed,
+    and the kernel works while Python does.
+
+    The handle must come from open_volume_handle(drive, overlapped=True).
+    Two private 1 MB buffers are used instead of the shared module buffer,
+    since both are in flight at once.
+
+    Args:
+        handle: Overlapped volume handle.
+        start_usn / reason_mask / usn_journal_id: As read_usn_journal_records.
+        accept_reason_mask / name_prefix: Parse-level push-down filters;
+                                          a str name_prefix is encoded to
+                                          UTF-16-LE once up front.
+        max_reads (int, optional): Stop after this many buffers, for
+                                   incremental sweeps.
+
+    Returns:
+        tuple: (records, next_usn) covering every buffer read.
+    """
+    if isinstance(name_prefix, str):
+        name_prefix = name_prefix.encode('utf-16-le')
+
+    buffers = (win32file.AllocateReadBuffer(_USN_READ_BUF_SIZE),
+               win32file.AllocateReadBuffer(_USN_READ_BUF_SIZE))
+    overlappeds = []
+    for _ in range(2):
+        ov = pywintypes.OVERLAPPED()
+        ov.hEvent = win32event.CreateEvent(None, True, False, None)
+        overlappeds.append(ov)
+
+    def submit(slot, usn):
+        read_data = _READ_DATA.pack(usn, reason_mask, 0, 0, 0, usn_journal_id)
+        win32file.DeviceIoControl(
+            handle,
+            FSCTL_READ_USN_JOURNAL,
+            read_data,
+            buffers[slot],
+            overlappeds[slot]
+        )
+
+    records = []
+    next_usn = start_usn
+    reads = 0
+    slot = 0
+    try:
+        submit(slot, next_usn)
+    except win32api.error as e:
+        logger.error("Error reading USN Journal: %s", e)
         return [], start_usn
 
+    while True:
+        try:
+            bytes_returned = win32file.GetOverlappedResult(
+                handle, overlappeds[slot], True)
+        except win32api.error as e:
+            logger.error("Error reading USN Journal: %s", e)
+            break
+
+        mv = memoryview(buffers[slot])
+        usn_after_read = _U64.unpack_from(mv, 0)[0]
+        reads += 1
+        # An empty buffer or a non-advancing USN means the journal tail
+        # was reached.
+        stop = (bytes_returned <= 8 or usn_after_read == next_usn
+                or (max_reads is not None and reads >= max_reads))
+        next_usn = usn_after_read
+
+        if not stop:
+            # Kick off the next read into the other buffer before parsing
+            # this one: the kernel fills it while Python walks these bytes.
+            try:
+                submit(slot ^ 1, next_usn)
+            except win32api.error as e:
+                logger.error("Error reading USN Journal: %s", e)
+                stop = True
+
+        records.extend(_walk_records(mv, bytes_returned,
+                                     accept_reason_mask=accept_reason_mask,
+                                     name_prefix=name_prefix))
+        if stop:
+            break
+        slot ^= 1
+
+    return records, next_usn
+
+def enum_usn_data(handle, high_usn, low_usn=0):
+    """
+    Enumerates the volume's master file table via FSCTL_ENUM_USN_DATA,
+    returning exactly one USN record per existing file/directory.
+
+    For "what files exist right now" workloads this is orders of magnitude
+    less data than replaying every historical change record with
+    FSCTL_READ_USN_JOURNAL back to LowestValidUsn. The rename-detection
+    workflow should keep using read_usn_journal_records, which sees the
+    change history this call deliberately skips.
+
+    Args:
+        handle: Volume handle from open_volume_handle.
+        high_usn (int): Upper USN bound, typically the journal's NextUsn.
+        low_usn (int): Lower USN bound (0 = everything).
+
+    Returns:
+        list: Parsed UsnRecord objects, one per live file/directory.
+    """
+    global _USN_READ_BUF
+    if _USN_READ_BUF is None:
+        _USN_READ_BUF = win32file.AllocateReadBuffer(_USN_READ_BUF_SIZE)
+
+    records = []
+    start_frn = 0
+    while True:
+        enum_data = _MFT_ENUM_DATA_V0.pack(start_frn, low_usn, high_usn)
+        try:
+            bytes_returned = win32file.DeviceIoControl(
+                handle,
+                FSCTL_ENUM_USN_DATA,
+                enum_data,
+                _USN_READ_BUF,
+                None
+            )
+        except win32api.error:
+            # ERROR_HANDLE_EOF signals the end of the MFT enumeration
+            break
+
+        if bytes_returned <= 8:
+            break
+
+        mv = memoryview(_USN_READ_BUF)
+        # The first 8 bytes carry the next StartFileReferenceNumber
+        start_frn = _U64.unpack_from(mv, 0)[0]
+        records.extend(_walk_records(mv, bytes_returned))
+
+    return records
+
+# PyHANDLE objects are unhashable, so the lru_cache below is keyed on
+# id(volume_handle) and this map resolves the id back to the live handle.
+# Entries are registered by get_path_from_frn; the map stays tiny (one
+# entry per open volume).
+_VOLUME_HANDLES = {}
+
 def get_path_from_frn(volume_handle, frn):
     """
     Attempts to get the full path of a file/directory given its File Reference Number (FRN).
     This is a complex operation and might not always succeed, especially for deleted files.
+
+    Results are memoized per (volume, FRN): journal replays resolve the
+    same FRNs — parent directories above all — thousands of times, and
+    each uncached lookup costs an OpenFileById plus a
+    GetFinalPathNameByHandle round-trip. Failures are cached too, so a
+    deleted FRN fails through the kernel once instead of on every record
+    that references it.
     """
+    _VOLUME_HANDLES[id(volume_handle)] = volume_handle
+    return _get_path_from_frn_cached(id(volume_handle), frn)
+
+@functools.lru_cache(maxsize=65536)
+def _get_path_from_frn_cached(volume_handle_id, frn):
+    volume_handle = _VOLUME_HANDLES[volume_handle_id]
     try:
         # Open the file by its File ID (FRN)
         file_handle = win32file.OpenFileById(
@@ -231,7 +717,7 @@ def get_path_from_frn(volume_handle, frn):
         win32file.CloseHandle(file_handle)
         return path
     except win32api.error as e:
-        # print(f"Error getting path for FRN {frn}: {e}")
+        logger.debug("Error getting path for FRN %s: %s", frn, e)
         return None
 
 def process_usn_records_for_renames(usn_records):
@@ -244,34 +730,41 @@ def process_usn_records_for_renames(usn_records):
     rename_events = []
     old_name_records = {}
 
+    # Hot loop over potentially hundreds of thousands of records: bind the
+    # reason constants and the container methods to locals so each
+    # iteration skips the module-global and attribute lookups, and stash
+    # the whole OLD record instead of building a throwaway 3-field dict —
+    # OLD/NEW pairs usually sit adjacent in journal order, so entries live
+    # only a moment.
+    reason_old = USN_REASON_RENAME_OLD_NAME
+    reason_new = USN_REASON_RENAME_NEW_NAME
+    append_event = rename_events.append
+    pop_old = old_name_records.pop
+
     for record in usn_records:
-        frn = record["FileReferenceNumber"]
-        reason = record["Reason"]
+        reason = record.Reason
 
-        if reason & USN_REASON_RENAME_OLD_NAME:
+        if reason & reason_old:
             # Store the old name record, keyed by FRN
-            old_name_records[frn] = {
-                "filename": record["FileName"],
-                "parent_frn": record["ParentFileReferenceNumber"],
-                "timestamp": record["TimeStamp"]
-            }
-        elif reason & USN_REASON_RENAME_NEW_NAME:
+            old_name_records[record.FileReferenceNumber] = record
+        elif reason & reason_new:
             # If a new name record is found, try to match it with an old name record
-            if frn in old_name_records:
-                old_record_info = old_name_records.pop(frn) # Remove it once matched
-                rename_events.append({
-                    "old_filename": old_record_info["filename"],
-                    "new_filename": record["FileName"],
+            frn = record.FileReferenceNumber
+            old_record = pop_old(frn, None) # Remove it once matched
+            if old_record is not None:
+                append_event({
+                    "old_filename": old_record.FileName,
+                    "new_filename": record.FileName,
                     "file_reference_number": frn,
-                    "old_parent_file_reference_number": old_record_info["parent_frn"],
-                    "new_parent_file_reference_number": record["ParentFileReferenceNumber"],
-                    "timestamp": record["TimeStamp"]
+                    "old_parent_file_reference_number": old_record.ParentFileReferenceNumber,
+                    "new_parent_file_reference_number": record.ParentFileReferenceNumber,
+                    "timestamp": record.TimeStamp
                 })
             else:
                 # This might happen if the old_name_record was outside the current batch of records
                 # Or if the journal was reset, etc.
-                # For now, we'll just log it or handle as an unmatched new name
-                print(f"Warning: Unmatched RENAME_NEW_NAME record for FRN {frn}: {record["FileName"]}")
+                logger.warning("Unmatched RENAME_NEW_NAME record for FRN %s: %s",
+                               frn, record.FileName)
 
     return rename_events
 
@@ -303,10 +796,10 @@ def get_file_frn(file_path):
 
         # FileId is a 16-byte structure, the FRN is the first 8 bytes (low part of the FileId)
         # For NTFS, the FileId is a 64-bit value, so we take the first 8 bytes.
-        frn = struct.unpack('<Q', file_info.FileId[:8])[0]
+        frn = _U64.unpack_from(file_info.FileId, 0)[0]
         return frn
     except win32api.error as e:
-        # print(f"Error getting FRN for {file_path}: {e}")
+        logger.debug("Error getting FRN for %s: %s", file_path, e)
         return None
 
 if __name__ == "__main__":
@@ -335,13 +828,10 @@ if __name__ == "__main__":
             print(f"\nRead {len(records)} USN records.")
             for i, record in enumerate(records):
                 print(f"\n--- Record {i+1} ---")
-                for key, value in record.items():
+                for key, value in record.to_dict().items():
                     print(f"  {key}: {value}")
-                
-                if record["Reason"] & USN_REASON_RENAME_OLD_NAME:
-                    print("  !!! RENAME_OLD_NAME detected !!!")
-                if record["Reason"] & USN_REASON_RENAME_NEW_NAME:
-                    print("  !!! RENAME_NEW_NAME detected !!!")
+
+                print(f"  Reasons: {reason_to_str(record.Reason)}")
 
             rename_events = process_usn_records_for_renames(records)
             if rename_events:
@@ -8,25 +8,57 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from anti_forensics.router import ads_bp
 
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+
+    class OrjsonProvider(DefaultJSONProvider):
+        """
+        Flask JSON provider backed by orjson. jsonify responses for large
+        ADS scan results encode several times faster than with stdlib json,
+        with no changes needed in the route handlers.
+        """
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+except ImportError:
+    OrjsonProvider = None
+
 app = Flask(__name__)
+if OrjsonProvider is not None:
+    app.json = OrjsonProvider(app)
 
-# Configure CORS properly
-CORS(app, 
+# Configure CORS properly. flask_cors owns the Access-Control-* headers
+# outright; a previous after_request hook re-added the same four headers on
+# every response, costing a Python call plus four header-list mutations per
+# request and producing duplicate headers some browsers reject on preflight.
+CORS(app,
      origins=["http://localhost:4200"],  # Angular dev server
      supports_credentials=True,
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
      allow_headers=["Content-Type", "Authorization"])
 
-@app.after_request
-def after_request(response):
-    response.headers.add('Access-Control-Allow-Origin', 'http://localhost:4200')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-    response.headers.add('Access-Control-Allow-Credentials', 'true')
-    return response
-
 app.register_blueprint(ads_bp, url_prefix='/api/ads')
 
 if __name__ == '__main__':
-    # Run on different port than Angular (4200)
-    app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
+    # Run on different port than Angular (4200). Werkzeug's dev server is
+    # single-threaded and keeps a stat-polling reloader subprocess alive, so
+    # it serializes concurrent Angular requests; production runs go through
+    # waitress instead. Set FLASK_ENV=development to keep the debugger and
+    # reloader while working on the backend.
+    if os.environ.get('FLASK_ENV') == 'development':
+        app.run(debug=True, port=5000, host='0.0.0.0')
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            serve = None
+            print("waitress not found. Falling back to the Flask dev server.")
+
+        if serve is not None:
+            serve(app, host='0.0.0.0', port=5000, threads=8,
+                  connection_limit=200)
+        else:
+            app.run(port=5000, host='0.0.0.0')
\ No newline at end of file